@@ -1,6 +1,5 @@
 from fastmcp import FastMCP
 import os
-import requests
 from dotenv import load_dotenv
 from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -8,7 +7,11 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_tavily import TavilySearch
 import httpx
+import anyio
+import orjson
 import asyncio
+import time
+from collections import OrderedDict
 
 load_dotenv()
 
@@ -22,6 +25,39 @@ if not TAVILY_API_KEY or not GOOGLE_API_KEY:
 
 recycle_mcp = FastMCP("Recycling_Server")
 
+#Shared HTTP client so outbound API calls reuse pooled keep-alive connections
+http_client = httpx.AsyncClient(timeout=10)
+
+#Longest web search snippet passed back to the agents
+MAX_WEB_CONTENT_LENGTH = 500
+
+#Short lived cache for web search and geolocation results, stored as (timestamp, result)
+WEB_SEARCH_TTL = 300
+GEOLOCATION_TTL = 600
+TOOL_CACHE_SIZE = 1024
+tool_cache = OrderedDict()
+
+#Function that returns a cached tool result if it is younger than ttl seconds
+def get_cached_result(key, ttl):
+    entry = tool_cache.get(key)
+    if entry is None:
+        return None
+
+    cached_at, result = entry
+    if time.monotonic() - cached_at > ttl:
+        del tool_cache[key]
+        return None
+
+    tool_cache.move_to_end(key)
+    return result
+
+#Function that stores a tool result, dropping the least recently used entry when full
+def cache_result(key, result):
+    tool_cache[key] = (time.monotonic(), result)
+    tool_cache.move_to_end(key)
+    if len(tool_cache) > TOOL_CACHE_SIZE:
+        tool_cache.popitem(last=False)
+
 document = TextLoader(file_path="./knowledge_base/knowledge_base.txt").load()
 text_splitter = RecursiveCharacterTextSplitter(
     chunk_size=200,
@@ -38,6 +74,19 @@ vector_store = Chroma(
 
 vector_store.add_documents(documents=chunks)
 
+#The knowledge base is loaded once at startup and never changes, so repeated queries
+#can reuse earlier search results instead of paying for another embedding call
+#Results are keyed by the normalized query, but the original query is what gets searched
+KB_CACHE_SIZE = 1024
+kb_cache = OrderedDict()
+
+#Function that stores knowledge base results, dropping the least recently used entry when full
+def cache_kb_results(key, results):
+    kb_cache[key] = results
+    kb_cache.move_to_end(key)
+    if len(kb_cache) > KB_CACHE_SIZE:
+        kb_cache.popitem(last=False)
+
 @recycle_mcp.tool(title="Knowledge Base Retrieval")
 async def regulation_retrieval(query: str) -> dict:
     """Function that retrieves relevant information from the knowledge base. 
@@ -48,11 +97,20 @@ async def regulation_retrieval(query: str) -> dict:
         Returns:
             dictionary with the query as well as any results in a list
     """
-    loop = asyncio.get_running_loop()
-    results = await loop.run_in_executor(
-        None, lambda: vector_store.similarity_search(query, k=3)
-    )
-    return {"query": query, "results": [doc.page_content for doc in results]}
+    cache_key = " ".join(query.lower().split())
+    results = kb_cache.get(cache_key)
+
+    if results is None:
+        loop = asyncio.get_running_loop()
+        documents = await loop.run_in_executor(
+            None, lambda: vector_store.similarity_search(query, k=3)
+        )
+        results = [doc.page_content for doc in documents]
+        cache_kb_results(cache_key, results)
+    else:
+        kb_cache.move_to_end(cache_key)
+
+    return {"query": query, "results": list(results)}
 
 
 tavily_search = TavilySearch(api_key=TAVILY_API_KEY, max_results=3)
@@ -68,7 +126,29 @@ async def web_search(query: str) -> dict:
             results: results of the web search in the form of a dict
     """
 
-    search_result = await tavily_search.invoke(query)
+    cache_key = ("web_search", " ".join(query.lower().split()))
+    search_result = get_cached_result(cache_key, WEB_SEARCH_TTL)
+
+    if search_result is None:
+        search_result = await tavily_search.ainvoke(query)
+
+        #Tavily reports failures as {"error": ...} instead of raising, pass them on as text and never cache them
+        if "error" in search_result:
+            return {"error": str(search_result["error"])}
+
+        #Trim successful results only, keeping the fields the agents read so the prompt stays small
+        search_result = {
+            "query": query,
+            "results": [
+                {
+                    "title": row.get("title", ""),
+                    "url": row.get("url", ""),
+                    "content": row.get("content", "")[:MAX_WEB_CONTENT_LENGTH]
+                }
+                for row in search_result.get("results", [])
+            ]
+        }
+        cache_result(cache_key, search_result)
 
     return search_result
 
@@ -82,16 +162,22 @@ async def geolocate_ip() -> dict:
 
     url = f"http://ip-api.com/json/"
 
+    #The server's location rarely changes, so reuse a recent successful lookup
+    cached_location = get_cached_result(("geolocate_ip",), GEOLOCATION_TTL)
+    if cached_location is not None:
+        return cached_location
+
     try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            geo_data = response.json()
+        response = await http_client.get(url, timeout=5)
+        response.raise_for_status()
+        geo_data = orjson.loads(response.content)
 
         if geo_data.get("status") != "success":
             raise ValueError(f"Geolocation Lookup Failed {geo_data}")
-        return {"latitude": geo_data["lat"], 
-                "longitude": geo_data["lon"]}
+        location = {"latitude": geo_data["lat"], 
+                    "longitude": geo_data["lon"]}
+        cache_result(("geolocate_ip",), location)
+        return location
 
     except Exception as e:
         return {"error": str(e)}
@@ -115,7 +201,7 @@ async def get_places(query: str, latitude: float, longitude: float) -> dict:
     headers = {
         'Content-Type': 'application/json',
         'X-Goog-Api-Key': GOOGLE_API_KEY,
-        'X-Goog-FieldMask': '*'
+        'X-Goog-FieldMask': 'places.displayName,places.formattedAddress,places.nationalPhoneNumber'
     }
 
     #request body
@@ -133,10 +219,10 @@ async def get_places(query: str, latitude: float, longitude: float) -> dict:
         }
     }
 
-    #get response
-    response = requests.post(url, headers=headers, json=request_body)
+    #get response without blocking the event loop
+    response = await http_client.post(url, headers=headers, json=request_body)
     #get JSON object
-    output = response.json()
+    output = orjson.loads(response.content)
     #save the locations in a dictionary
     locations = []
 
@@ -156,5 +242,19 @@ async def get_places(query: str, latitude: float, longitude: float) -> dict:
         "longitude_used": longitude,
         "results": locations
     }
+
+#Function that runs the HTTP server and releases the shared client's pooled connections on shutdown
+async def serve():
+    try:
+        await recycle_mcp.run_async(
+            transport="http",
+            host="0.0.0.0",
+            port=8000,
+            uvicorn_config={"http": "httptools"}
+        )
+    finally:
+        await http_client.aclose()
+
 if __name__ == "__main__":
-    recycle_mcp.run(transport="http", host="0.0.0.0", port=8000)
\ No newline at end of file
+    #uvicorn's own loop setting is ignored when FastMCP starts the server, so select uvloop through anyio
+    anyio.run(serve, backend_options={"use_uvloop": True})
@@ -1,11 +1,14 @@
 from langchain_openai import ChatOpenAI
 import os
+import re
+import time
 import asyncio
+from collections import OrderedDict
 from dotenv import load_dotenv
 from fastmcp import Client
 from langchain_mcp_adapters.tools import load_mcp_tools
 from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import convert_to_messages
+from langchain_core.messages import convert_to_messages, ToolMessage
 from langgraph_supervisor import create_supervisor
 from langchain.chat_models import init_chat_model
 from slack_bolt.async_app import AsyncApp
@@ -32,6 +35,51 @@ if not OPENAI_API_KEY or not SLACK_BOT_TOKEN or not SLACK_APP_TOKEN:
 
 app = AsyncApp(token=SLACK_BOT_TOKEN)
 
+#Matches Slack user mentions such as <@U012AB3CD> so they can be stripped from the query
+MENTION_PATTERN = re.compile(r"<@[A-Z0-9]+>")
+
+#Longest query forwarded to the supervisor, anything past this is dropped to bound prompt size
+MAX_QUERY_LENGTH = 1000
+
+#Longest a single supervisor run may take, in seconds, before the user gets a fallback reply
+SUPERVISOR_TIMEOUT = 120
+
+#Recent answers keyed by normalized query, stored as (timestamp, answer) and evicted oldest first
+RESPONSE_CACHE_TTL = 3600
+RESPONSE_CACHE_SIZE = 1024
+response_cache = OrderedDict()
+
+#Function that returns a cached answer for the query if one exists and has not expired
+def get_cached_response(key):
+    entry = response_cache.get(key)
+    if entry is None:
+        return None
+
+    cached_at, text = entry
+    if time.monotonic() - cached_at > RESPONSE_CACHE_TTL:
+        del response_cache[key]
+        return None
+
+    response_cache.move_to_end(key)
+    return text
+
+#Function that stores an answer, dropping the least recently used entry when full
+def cache_response(key, text):
+    response_cache[key] = (time.monotonic(), text)
+    response_cache.move_to_end(key)
+    if len(response_cache) > RESPONSE_CACHE_SIZE:
+        response_cache.popitem(last=False)
+
+#Function that checks whether any tool call in a run failed, answers built on failures are not cached
+def has_tool_error(messages):
+    for message in messages:
+        if isinstance(message, ToolMessage) and (message.status == "error" or '"error"' in str(message.content)):
+            return True
+    return False
+
+#Supervisor runs currently in progress, keyed by normalized query
+inflight_queries = {}
+
 #Function used to print out output in a pretty and readable format. 
 #Not directly used, but can be used for testing and error handling.
 def pretty_print_message(message, indent=False):
@@ -75,50 +123,57 @@ def pretty_print_messages(update, last_message=False):
 
 #Function used to build locator agent
 #Later called in main
-async def build_locator_agent(recycle_mcp):
-    async with recycle_mcp:
-        tools = await load_mcp_tools(recycle_mcp.session)
-        locator_agent = create_react_agent(
-            model="openai:gpt-4.1-mini",
-            tools=tools,
-            prompt=(
-                "You are a locator agent.\n\n"
-                "INSTRUCTIONS:\n"
-                "- Assist ONLY with locating-related tasks, DO NOT do any math\n"
-                "- You will ONLY use the MCP function tools geolocate_ip() and get_places(query, latitude, longitude)\n"
-                "- You MUST retrieve the IP, latitude, and longitude FIRST by using the geolocate_ip() tool"
-                "- ONLY after you have retrieved the latitude and longitude will you use the get_places(query, latitude, longitude)"
-                "- After you're done with your tasks, respond to the supervisor directly\n"
-                "- Respond ONLY with the results of your work, do NOT include ANY other text."
-            ),
-            name="locator_agent"
-        )
-        return locator_agent
+def build_locator_agent(tools):
+    locator_agent = create_react_agent(
+        model="openai:gpt-4.1-mini",
+        tools=tools,
+        prompt=(
+            "You are a locator agent.\n\n"
+            "INSTRUCTIONS:\n"
+            "- Assist ONLY with locating-related tasks, DO NOT do any math\n"
+            "- You will ONLY use the MCP function tools geolocate_ip() and get_places(query, latitude, longitude)\n"
+            "- You MUST retrieve the IP, latitude, and longitude FIRST by using the geolocate_ip() tool"
+            "- ONLY after you have retrieved the latitude and longitude will you use the get_places(query, latitude, longitude)"
+            "- After you're done with your tasks, respond to the supervisor directly\n"
+            "- Respond ONLY with the results of your work, do NOT include ANY other text."
+        ),
+        name="locator_agent"
+    )
+    return locator_agent
     
 #Function that builds research agent
 #Later called in main
-async def build_research_agent(recycle_mcp):
-    async with recycle_mcp:
-        tools = await load_mcp_tools(recycle_mcp.session)
-        research_agent = create_react_agent(
-            model="openai:gpt-4.1-mini",
-            tools=tools,
-            prompt=(
-                "INSTRUCTIONS:\n"
-                "You are a research agent.\n\n"
-                "INSTRUCTIONS:\n"
-                "- Assist ONLY with research-related tasks, DO NOT do any math\n"
-                "- You will ONLY use the MCP function regulation_retrieval(query: str)"
-                "- Do NOT use any other tool."
-                "- First consult the waste disposal knowledge base when possible.\n"
-                "- If needed, then you may use web search for additional context.\n"
-                "- After you're done with your tasks, respond to the supervisor directly\n"
-                "- Respond ONLY with the results of your work, do NOT include ANY other text."
-            ),
-            name="research_agent",
-        )
-        return research_agent
+def build_research_agent(tools):
+    research_agent = create_react_agent(
+        model="openai:gpt-4.1-mini",
+        tools=tools,
+        prompt=(
+            "You are a research agent.\n\n"
+            "INSTRUCTIONS:\n"
+            "- Assist ONLY with research-related tasks, DO NOT do any math\n"
+            "- You will ONLY use the MCP function regulation_retrieval(query: str)"
+            "- Do NOT use any other tool."
+            "- First consult the waste disposal knowledge base when possible.\n"
+            "- If needed, then you may use web search for additional context.\n"
+            "- After you're done with your tasks, respond to the supervisor directly\n"
+            "- Respond ONLY with the results of your work, do NOT include ANY other text."
+        ),
+        name="research_agent",
+    )
+    return research_agent
     
+#Function that runs the supervisor for a query and caches its final answer
+async def answer_query(query, cache_key):
+    response = await asyncio.wait_for(
+        supervisor.ainvoke({"messages": [{"role": "user", "content": query}]}, {"configurable":{"recursion_limit": 15}}),
+        timeout=SUPERVISOR_TIMEOUT
+    )
+
+    text = response["messages"][-1].content
+    if not has_tool_error(response["messages"]):
+        cache_response(cache_key, text)
+    return text
+
 @app.event("app_mention")
 async def handle_query(body, say):
     global supervisor
@@ -130,18 +185,39 @@ async def handle_query(body, say):
         await say(text="Bot is still starting, please try again.", thread_ts=thread_ts)
         return
 
-    response = await supervisor.ainvoke({"messages": [{"role": "user", "content": message}]}, {"configurable":{"recursion_limit": 15}})
-    #print("invoke")
-    
-    text = response["messages"][-1].content
+    query = MENTION_PATTERN.sub("", message).strip()[:MAX_QUERY_LENGTH]
+
+    #A bare mention has nothing to answer, so skip the supervisor and its LLM calls
+    if not query:
+        await say(text="Please ask me a question about how to dispose of or recycle an item.", thread_ts=thread_ts)
+        return
+
+    #Identical questions skip the agents entirely and reuse the earlier answer
+    cache_key = " ".join(query.lower().split())
+    text = get_cached_response(cache_key)
+
+    if text is None:
+        #Concurrent identical questions wait on the same supervisor run instead of starting their own
+        task = inflight_queries.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(answer_query(query, cache_key))
+            inflight_queries[cache_key] = task
+            task.add_done_callback(lambda _: inflight_queries.pop(cache_key, None))
+        try:
+            text = await asyncio.shield(task)
+        except asyncio.TimeoutError:
+            await say(text="Sorry, I couldn't answer that in time. Please try again later.", thread_ts=thread_ts)
+            return
 
     await say(text=text, thread_ts=thread_ts)
 
 async def main():
     global supervisor
     async with Client("http://mcp-server:8000/mcp") as recycle_mcp:
-        locator_agent = await build_locator_agent(recycle_mcp)
-        research_agent = await build_research_agent(recycle_mcp)
+        #Load the MCP tools once and share them between both agents
+        tools = await load_mcp_tools(recycle_mcp.session)
+        locator_agent = build_locator_agent(tools)
+        research_agent = build_research_agent(tools)
 
         supervisor = create_supervisor(
             model=init_chat_model("openai:gpt-4.1-mini"),